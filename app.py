@@ -1,10 +1,15 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 import traceback
 
-from core.utils import normalize_columns, ensure_datetime, segment_donors_basic, month_floor
-from core.metrics import compute_kpis, compute_rollups
+from core.utils import DONOR_SEGMENTS, normalize_columns, ensure_datetime, segment_donors_basic, source_columns, join_filters
+from core.metrics import compute_kpis, compute_monthly, compute_rollups
 from core.charts import line_trend, bar_compare, waterfall_net, donor_mix_pie
 
 macro_view = None
@@ -27,6 +32,15 @@ mode = st.sidebar.radio(
 
 DISABLE_WORD_EXPORT = False
 
+# Normalized uploads can be persisted here so a new session with the same file skips the CSV parse.
+# The files hold donor data (names, IDs), so the cache is opt-in: set BJC_ROI_PARQUET_CACHE=1 on a
+# single-user machine. Only the newest PARQUET_CACHE_MAX_FILES files are kept.
+# Bump the version whenever the normalization pipeline changes so stale files are ignored (and pruned).
+PARQUET_CACHE_ENABLED = os.environ.get("BJC_ROI_PARQUET_CACHE", "").strip().lower() in ("1", "true", "yes")
+PARQUET_CACHE_DIR = Path.home() / ".cache" / "bjc_roi"
+PARQUET_CACHE_VERSION = 6
+PARQUET_CACHE_MAX_FILES = 8
+
 
 def guide_tab():
     st.header("Guide")
@@ -255,6 +269,137 @@ Exports a concise executive summary.
         )
 
 
+def _prepare_donations(raw: pd.DataFrame) -> pd.DataFrame:
+    df = normalize_columns(raw, kind="donations")
+    df = ensure_datetime(df, "date")
+    # Arrow-backed strings: donor_id is the key for segmentation and the unique-donor count.
+    # Numeric IDs with blanks are read as float; go through Int64 so 101 stays "101", not "101.0".
+    ids = df["donor_id"]
+    if pd.api.types.is_float_dtype(ids) and (ids.dropna() % 1 == 0).all():
+        ids = ids.astype("Int64")
+    df["donor_id"] = ids.astype("string[pyarrow]")
+    df = segment_donors_basic(df)
+    df["month"] = df["date"].dt.to_period("M").astype(str)
+    # donor_segment is already categorical from segment_donors_basic
+    for col in ("channel", "campaign_code"):
+        df[col] = df[col].astype("category")
+    # Sorted by date so micro_view can slice the date range with searchsorted
+    return df.sort_values("date", kind="mergesort").reset_index(drop=True)
+
+
+def _prepare_costs(raw: pd.DataFrame) -> pd.DataFrame:
+    df = normalize_columns(raw, kind="costs")
+    df = ensure_datetime(df, "date")
+    df["month"] = df["date"].dt.to_period("M").astype(str)
+    for col in ("channel", "campaign_code"):
+        df[col] = df[col].astype("category")
+    return df.sort_values("date", kind="mergesort").reset_index(drop=True)
+
+
+def _prune_parquet_cache() -> None:
+    """Drop cache files from older versions and all but the newest PARQUET_CACHE_MAX_FILES."""
+    current = []
+    for p in PARQUET_CACHE_DIR.glob("*-v*-*.parquet"):
+        if f"-v{PARQUET_CACHE_VERSION}-" in p.name:
+            current.append(p)
+        else:
+            p.unlink(missing_ok=True)
+    current.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in current[PARQUET_CACHE_MAX_FILES:]:
+        p.unlink(missing_ok=True)
+
+
+def _load_with_parquet_cache(file_bytes: bytes, kind: str, prepare) -> pd.DataFrame:
+    digest = hashlib.sha1(file_bytes).hexdigest()
+    path = PARQUET_CACHE_DIR / f"{kind}-v{PARQUET_CACHE_VERSION}-{digest}.parquet"
+
+    if PARQUET_CACHE_ENABLED and path.exists():
+        try:
+            df = pd.read_parquet(path)
+            # Parquet stores an all-NaN categorical as plain object, so restore the dtypes
+            # _filter_options and the filters rely on
+            for col in ("channel", "campaign_code"):
+                df[col] = df[col].astype("category")
+            if "donor_segment" in df.columns:
+                df["donor_segment"] = df["donor_segment"].astype(pd.CategoricalDtype(DONOR_SEGMENTS))
+            return df
+        except Exception:
+            pass  # unreadable cache file: fall back to the CSV below
+
+    # Only parse the columns normalize_columns can map; exports often carry dozens of others
+    wanted = source_columns(kind)
+    raw = pd.read_csv(io.BytesIO(file_bytes), usecols=lambda c: str(c).strip().lower() in wanted)
+    df = prepare(raw)
+
+    if not PARQUET_CACHE_ENABLED:
+        return df
+
+    # Best-effort: a read-only or full disk should never break the dashboard
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        PARQUET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        _prune_parquet_cache()
+    except Exception:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    return df
+
+
+def _date_window(df: pd.DataFrame, start64: np.datetime64, end64: np.datetime64) -> pd.DataFrame:
+    """Rows with start64 <= date <= end64, as a positional slice of a date-sorted frame."""
+    dates = df["date"].to_numpy()
+    lo = np.searchsorted(dates, start64, side="left")
+    hi = np.searchsorted(dates, end64, side="right")
+    return df.iloc[lo:hi]
+
+
+def _filter_options(df: pd.DataFrame, columns: dict) -> dict:
+    """The date bounds and each categorical column's sorted categories, computed once per upload."""
+    # Kept out of df.attrs: pandas deep-copies attrs into every slice, column and groupby result
+    options = {"date_min": df["date"].min(), "date_max": df["date"].max()}
+    for key, col in columns.items():
+        options[key] = df[col].cat.categories.sort_values().tolist()
+    return options
+
+
+def _union_values(a: list, b: list) -> list:
+    """Sorted distinct values across two option lists."""
+    values = np.concatenate([np.asarray(a, dtype=object), np.asarray(b, dtype=object)])
+    return np.sort(pd.unique(values)).tolist()
+
+
+@st.cache_data(show_spinner=False)
+def _load_donations(file_bytes: bytes) -> tuple:
+    df = _load_with_parquet_cache(file_bytes, "donations", _prepare_donations)
+    return df, _filter_options(df, {"channels": "channel", "campaigns": "campaign_code", "segments": "donor_segment"})
+
+
+@st.cache_data(show_spinner=False)
+def _load_costs(file_bytes: bytes) -> tuple:
+    df = _load_with_parquet_cache(file_bytes, "costs", _prepare_costs)
+    return df, _filter_options(df, {"channels": "channel", "campaigns": "campaign_code"})
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _sorted_rollups(filter_key: tuple, by: str, _d: pd.DataFrame, _c: pd.DataFrame) -> pd.DataFrame:
+    # filter_key (upload digests + every filter value) determines _d and _c, so the frames aren't hashed
+    return compute_rollups(_d, _c, by=by).sort_values("raised", ascending=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _excel_report_bytes(data_key: tuple, report_key: dict, _d: pd.DataFrame, _c: pd.DataFrame, _payload: dict,
+                        _roll_campaign: pd.DataFrame, _roll_channel: pd.DataFrame) -> bytes:
+    # The filtered frames (and the rollups built from them) are fully determined by the uploaded
+    # files (data_key) and the filters inside report_key, so they are left out of the cache hash.
+    from core.reports_excel import build_excel_report
+    return build_excel_report(_d, _c, _payload, roll_campaign=_roll_campaign, roll_channel=_roll_channel)
+
+
 def micro_view():
     st.subheader("Micro View (Operational Tracking)")
     st.caption("Upload donations + cost CSV files to compute ROI, explore trends, and generate reports.")
@@ -284,24 +429,17 @@ def micro_view():
         st.info("Upload both **Donations CSV** and **Costs CSV** to begin.")
         st.stop()
 
-    donations_raw = pd.read_csv(donations_file)
-    costs_raw = pd.read_csv(costs_file)
-
-    donations_df = normalize_columns(donations_raw, kind="donations")
-    costs_df = normalize_columns(costs_raw, kind="costs")
-
-    donations_df = ensure_datetime(donations_df, "date")
-    costs_df = ensure_datetime(costs_df, "date")
-
-    donations_df = segment_donors_basic(donations_df)
-    donations_df["month"] = donations_df["date"].apply(month_floor)
-    costs_df["month"] = costs_df["date"].apply(month_floor)
+    # Cached on the uploaded bytes, so filter changes don't re-parse the CSVs
+    donations_bytes = donations_file.getvalue()
+    costs_bytes = costs_file.getvalue()
+    donations_df, donation_opts = _load_donations(donations_bytes)
+    costs_df, cost_opts = _load_costs(costs_bytes)
 
     st.sidebar.markdown("---")
     st.sidebar.header("2) Filters")
 
-    min_date = min(donations_df["date"].min(), costs_df["date"].min())
-    max_date = max(donations_df["date"].max(), costs_df["date"].max())
+    min_date = min(donation_opts["date_min"], cost_opts["date_min"])
+    max_date = max(donation_opts["date_max"], cost_opts["date_max"])
 
     date_range = st.sidebar.date_input(
         "Date range",
@@ -317,56 +455,71 @@ def micro_view():
         start_dt = pd.to_datetime(date_range)
         end_dt = start_dt + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
 
-    channels = sorted(set(donations_df["channel"].dropna().unique()).union(set(costs_df["channel"].dropna().unique())))
-    campaigns = sorted(set(donations_df["campaign_code"].dropna().unique()).union(set(costs_df["campaign_code"].dropna().unique())))
-    segments = sorted(donations_df["donor_segment"].dropna().unique())
+    channels = _union_values(donation_opts["channels"], cost_opts["channels"])
+    campaigns = _union_values(donation_opts["campaigns"], cost_opts["campaigns"])
+    segments = donation_opts["segments"]
 
     sel_channels = st.sidebar.multiselect("Channel", options=channels, default=channels)
     sel_campaigns = st.sidebar.multiselect("Campaign code", options=campaigns, default=campaigns)
     sel_segments = st.sidebar.multiselect("Donor segment", options=segments, default=segments)
 
-    d = donations_df[
-        (donations_df["date"] >= start_dt) & (donations_df["date"] <= end_dt) &
-        (donations_df["channel"].isin(sel_channels)) &
-        (donations_df["campaign_code"].isin(sel_campaigns)) &
-        (donations_df["donor_segment"].isin(sel_segments))
-    ].copy()
+    channel_set = set(sel_channels)
+    campaign_set = set(sel_campaigns)
+    segment_set = set(sel_segments)
+
+    start64 = np.datetime64(start_dt)
+    end64 = np.datetime64(end_dt)
+
+    d_window = _date_window(donations_df, start64, end64)
+    d_mask = np.logical_and.reduce([
+        d_window["channel"].isin(channel_set).to_numpy(),
+        d_window["campaign_code"].isin(campaign_set).to_numpy(),
+        d_window["donor_segment"].isin(segment_set).to_numpy(),
+    ])
+    d = d_window[d_mask]
 
-    c = costs_df[
-        (costs_df["date"] >= start_dt) & (costs_df["date"] <= end_dt) &
-        (costs_df["channel"].isin(sel_channels)) &
-        (costs_df["campaign_code"].isin(sel_campaigns))
-    ].copy()
+    c_window = _date_window(costs_df, start64, end64)
+    c_mask = np.logical_and.reduce([
+        c_window["channel"].isin(channel_set).to_numpy(),
+        c_window["campaign_code"].isin(campaign_set).to_numpy(),
+    ])
+    c = c_window[c_mask]
 
-    kpis = compute_kpis(d, c)
+    data_key = (hashlib.sha1(donations_bytes).hexdigest(), hashlib.sha1(costs_bytes).hexdigest())
+    filter_key = (data_key, str(start_dt), str(end_dt), tuple(sel_channels), tuple(sel_campaigns), tuple(sel_segments))
+
+    d_monthly, c_monthly = compute_monthly(d, c)
+    kpis = compute_kpis(d, c, d_monthly=d_monthly, c_monthly=c_monthly)
 
     k1, k2, k3, k4, k5 = st.columns(5)
-    k1.metric("Total Raised", f"${kpis['total_raised']:,.0f}")
-    k2.metric("Total Costs", f"${kpis['total_costs']:,.0f}")
-    k3.metric("Net Raised", f"${kpis['net_raised']:,.0f}")
-    k4.metric("ROI", f"{kpis['roi']*100:,.1f}%")
-    k5.metric("Cost to Raise $1", f"${kpis['cost_to_raise_1']:,.2f}")
+    k1.metric("Total Raised", f"${kpis.total_raised:,.0f}")
+    k2.metric("Total Costs", f"${kpis.total_costs:,.0f}")
+    k3.metric("Net Raised", f"${kpis.net_raised:,.0f}")
+    k4.metric("ROI", f"{kpis.roi*100:,.1f}%")
+    k5.metric("Cost to Raise $1", f"${kpis.cost_to_raise_1:,.2f}")
 
     st.markdown("---")
     st.subheader("Interactive Charts")
 
+    # Shared by the comparison tabs and both report builders
+    roll_campaign = _sorted_rollups(filter_key, "campaign_code", d, c)
+    roll_channel = _sorted_rollups(filter_key, "channel", d, c)
+
     tab1, tab2, tab3, tab4 = st.tabs(["Trend", "Compare Campaigns", "Compare Channels", "Donor Mix"])
 
     with tab1:
-        st.plotly_chart(line_trend(d, c), use_container_width=True)
+        st.plotly_chart(line_trend(d, c, d_monthly, c_monthly), use_container_width=True)
         st.plotly_chart(waterfall_net(kpis), use_container_width=True)
 
     with tab2:
-        roll = compute_rollups(d, c, by="campaign_code")
         top_n = st.slider("Top N (by Raised)", 5, 50, 15)
-        roll_top = roll.sort_values("raised", ascending=False).head(top_n)
+        roll_top = roll_campaign.head(top_n)
         st.dataframe(roll_top, use_container_width=True)
         st.plotly_chart(bar_compare(roll_top, group_col="campaign_code"), use_container_width=True)
 
     with tab3:
-        roll = compute_rollups(d, c, by="channel").sort_values("raised", ascending=False)
-        st.dataframe(roll, use_container_width=True)
-        st.plotly_chart(bar_compare(roll, group_col="channel"), use_container_width=True)
+        st.dataframe(roll_channel, use_container_width=True)
+        st.plotly_chart(bar_compare(roll_channel, group_col="channel"), use_container_width=True)
 
     with tab4:
         st.plotly_chart(donor_mix_pie(d), use_container_width=True)
@@ -387,15 +540,19 @@ def micro_view():
             "campaigns": sel_campaigns,
             "segments": sel_segments
         },
-        "kpis": kpis,
+        "kpis": kpis._asdict(),
     }
+    # Joined once here; the Excel and Word builders both read these strings
+    payload["filters_joined"] = join_filters(payload["filters"])
 
-    from core.reports_excel import build_excel_report
+    # generated_at changes every rerun and is not written to the workbook; filters_joined is
+    # derived from filters, which is already part of the key
+    report_key = {k: v for k, v in payload.items() if k not in ("generated_at", "filters_joined")}
 
     colx, colw = st.columns(2)
 
     with colx:
-        xlsx_bytes = build_excel_report(d, c, payload)
+        xlsx_bytes = _excel_report_bytes(data_key, report_key, d, c, payload, roll_campaign, roll_channel)
         st.download_button(
             "Download Excel report",
             data=xlsx_bytes,
@@ -408,7 +565,7 @@ def micro_view():
             st.info("Word export disabled in this environment.")
         else:
             from core.reports_word import build_word_report
-            docx_bytes = build_word_report(d, c, payload, notes=notes)
+            docx_bytes = build_word_report(d, c, payload, notes=notes, roll_campaign=roll_campaign)
             st.download_button(
                 "Download Word report",
                 data=docx_bytes,
@@ -1,3 +1,6 @@
+import weakref
+from typing import Dict, Tuple
+
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
@@ -5,16 +8,21 @@ import plotly.express as px
 # =========================
 # MICRO VIEW CHARTS
 # =========================
-def line_trend(d: pd.DataFrame, c: pd.DataFrame):
-    d_m = d.groupby("month")["amount"].sum().reset_index().rename(columns={"amount": "raised"})
-    c_m = c.groupby("month")["cost_amount"].sum().reset_index().rename(columns={"cost_amount": "costs"})
-    m = pd.merge(d_m, c_m, on="month", how="outer").fillna(0).sort_values("month")
-    m["net"] = m["raised"] - m["costs"]
+def line_trend(d: pd.DataFrame, c: pd.DataFrame, d_monthly: pd.Series = None, c_monthly: pd.Series = None):
+    if d_monthly is None:
+        d_monthly = d.groupby("month", sort=False, observed=True)["amount"].sum()
+    if c_monthly is None:
+        c_monthly = c.groupby("month", sort=False, observed=True)["cost_amount"].sum()
+    months = d_monthly.index.union(c_monthly.index).sort_values()
+    raised = d_monthly.reindex(months, fill_value=0).to_numpy()
+    costs = c_monthly.reindex(months, fill_value=0).to_numpy()
+    net = raised - costs
+    months = months.to_numpy()
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=m["month"], y=m["raised"], mode="lines+markers", name="Raised"))
-    fig.add_trace(go.Scatter(x=m["month"], y=m["costs"], mode="lines+markers", name="Costs"))
-    fig.add_trace(go.Scatter(x=m["month"], y=m["net"], mode="lines+markers", name="Net"))
+    fig.add_trace(go.Scattergl(x=months, y=raised, mode="lines+markers", name="Raised"))
+    fig.add_trace(go.Scattergl(x=months, y=costs, mode="lines+markers", name="Costs"))
+    fig.add_trace(go.Scattergl(x=months, y=net, mode="lines+markers", name="Net"))
     fig.update_layout(title="Monthly Trend: Raised vs Costs vs Net", xaxis_title="Month", yaxis_title="USD")
     return fig
 
@@ -32,12 +40,12 @@ def bar_compare(rollup: pd.DataFrame, group_col: str):
     return fig
 
 
-def waterfall_net(kpis: dict):
+def waterfall_net(kpis):
     fig = go.Figure(go.Waterfall(
         orientation="v",
         measure=["relative", "relative", "total"],
         x=["Raised", "Costs", "Net"],
-        y=[kpis["total_raised"], -kpis["total_costs"], kpis["net_raised"]],
+        y=[kpis.total_raised, -kpis.total_costs, kpis.net_raised],
         connector={"line": {"dash": "dot"}}
     ))
     fig.update_layout(title="Waterfall: Raised → Costs → Net", yaxis_title="USD")
@@ -45,7 +53,7 @@ def waterfall_net(kpis: dict):
 
 
 def donor_mix_pie(d: pd.DataFrame):
-    s = d.groupby("donor_segment")["amount"].sum().reset_index()
+    s = d.groupby("donor_segment", sort=False, observed=True)["amount"].sum().reset_index()
     fig = px.pie(s, values="amount", names="donor_segment", title="Donations by Donor Segment")
     return fig
 
@@ -53,21 +61,49 @@ def donor_mix_pie(d: pd.DataFrame):
 # =========================
 # MACRO VIEW HELPERS
 # =========================
-def _col(df: pd.DataFrame, *candidates: str) -> str:
-    for c in candidates:
-        if c in df.columns:
-            return c
-    raise KeyError(f"None of these columns found: {candidates}. Available: {list(df.columns)}")
+_MACRO_COLUMNS = {
+    "year": ("Year", "year"),
+    "donations": ("Donations", "donations"),
+    "cost": ("Cost", "cost"),
+    "net": ("Net", "net"),
+}
+
+# id(df) -> (df.columns at resolve time, {wanted: actual column}); entries drop when the frame is collected
+_colmap_cache: Dict[int, Tuple[pd.Index, Dict[str, str]]] = {}
+
+
+def _column_map(df: pd.DataFrame) -> Dict[str, str]:
+    key = id(df)
+    hit = _colmap_cache.get(key)
+    if hit is not None and hit[0] is df.columns:
+        return hit[1]
+
+    present = set(df.columns)
+    colmap = {}
+    for wanted, candidates in _MACRO_COLUMNS.items():
+        found = next((c for c in candidates if c in present), None)
+        if found is not None:
+            colmap[wanted] = found
+
+    if hit is None:
+        weakref.finalize(df, _colmap_cache.pop, key, None)
+    _colmap_cache[key] = (df.columns, colmap)
+    return colmap
+
+
+def _resolve_cols(df: pd.DataFrame, *wanted: str) -> Tuple[str, ...]:
+    colmap = _column_map(df)
+    for w in wanted:
+        if w not in colmap:
+            raise KeyError(f"None of these columns found: {_MACRO_COLUMNS[w]}. Available: {list(df.columns)}")
+    return tuple(colmap[w] for w in wanted)
 
 
 # =========================
 # MACRO VIEW CHARTS
 # =========================
 def macro_3yr_trend_line(forecast_df: pd.DataFrame):
-    year_col = _col(forecast_df, "Year", "year")
-    donations_col = _col(forecast_df, "Donations", "donations")
-    cost_col = _col(forecast_df, "Cost", "cost")
-    net_col = _col(forecast_df, "Net", "net")
+    year_col, donations_col, cost_col, net_col = _resolve_cols(forecast_df, "year", "donations", "cost", "net")
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=forecast_df[year_col], y=forecast_df[donations_col], mode="lines+markers", name="Donations"))
@@ -82,7 +118,7 @@ def macro_3yr_trend_line(forecast_df: pd.DataFrame):
 
 
 def macro_roi_bar(forecast_df: pd.DataFrame):
-    year_col = _col(forecast_df, "Year", "year")
+    (year_col,) = _resolve_cols(forecast_df, "year")
     y = forecast_df["ROI Multiple"].astype(float)
 
     fig = go.Figure()
@@ -96,8 +132,7 @@ def macro_roi_bar(forecast_df: pd.DataFrame):
 
 
 def macro_donations_allocation_chart(forecast_df: pd.DataFrame):
-    year_col = _col(forecast_df, "Year", "year")
-    donations_col = _col(forecast_df, "Donations", "donations")
+    year_col, donations_col = _resolve_cols(forecast_df, "year", "donations")
 
     df = forecast_df[[year_col, donations_col]].copy()
     df.columns = ["Year", "Donations"]
@@ -114,10 +149,7 @@ def macro_donations_allocation_chart(forecast_df: pd.DataFrame):
 
 
 def macro_comparison_chart(forecast_df: pd.DataFrame):
-    year_col = _col(forecast_df, "Year", "year")
-    donations_col = _col(forecast_df, "Donations", "donations")
-    cost_col = _col(forecast_df, "Cost", "cost")
-    net_col = _col(forecast_df, "Net", "net")
+    year_col, donations_col, cost_col, net_col = _resolve_cols(forecast_df, "year", "donations", "cost", "net")
 
     plot_df = forecast_df[[year_col, donations_col, cost_col, net_col]].copy()
     plot_df.columns = ["Year", "Donations", "Cost", "Net"]
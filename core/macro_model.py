@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
+from .utils import safe_div, safe_div_vec
 
-@dataclass
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the sensitivity grid falls back to NumPy broadcasting without it
+    njit = None
+    prange = range
+
+
+@dataclass(frozen=True, slots=True)
 class MacroInputs:
     total_donations_y1: float
     donor_continuation_rate: float
@@ -16,8 +25,60 @@ class MacroInputs:
     cost_shock: float = 0.0
 
 
-def _safe_div(a: float, b: float) -> float:
-    return float(a) / float(b) if b not in (0, None) else 0.0
+# Recommendation text used by build_macro_forecast
+_REC_CONT_LOW = "Donor continuation is relatively low. Improving retention of Year 1 donors would materially strengthen 3-year donations."
+_REC_CONT_MODERATE = "Donor continuation is moderate. Small improvements in retention could produce meaningful gains in long-term donations."
+_REC_CONT_STRONG = "Donor continuation is strong. Focus on sustaining donor relationships and protecting renewal rates."
+_REC_DONATION_MODEL = "The donation model assumes Year 2 comes from retained Year 1 donors, while Year 3 comes from retained Year 2 donors."
+_REC_COST_MODEL = "The cost model assumes Year 1 includes the full base cost plus organizational margin, Year 2 is a growth percentage of Year 1 cost, and Year 3 is a growth percentage of the combined Year 1 and Year 2 cost."
+_REC_GROWTH_NEGATIVE = "Cost growth is negative, meaning the model assumes cost reduction in Years 2 and 3."
+_REC_GROWTH_FLAT = "Cost growth is flat, so no additional Year 2 or Year 3 growth cost is assumed."
+_REC_GROWTH_POSITIVE = "Positive cost growth adds incremental cost in Years 2 and 3 based on prior accumulated cost."
+_REC_ROI_BELOW_1 = "The model shows costs exceed donations over the 3-year horizon. Review organizational margin, cost growth, and donor continuation assumptions."
+_REC_ROI_MODERATE = "The model shows a positive but moderate return. Tighter cost discipline or stronger donor continuation would improve the result."
+_REC_ROI_STRONG = "The model shows a strong return across the 3-year horizon. Maintaining donor continuation and cost discipline will be important."
+
+
+YEARS = ("Year 1", "Year 2", "Year 3")
+
+
+def _make_forecast_df(donations: np.ndarray, costs: np.ndarray) -> pd.DataFrame:
+    roi = safe_div_vec(donations, costs, where=costs > 0)
+    return pd.DataFrame({
+        "Year": YEARS,
+        "Donations": donations,
+        "Cost": costs,
+        "Net": donations - costs,
+        "ROI Multiple": roi,
+        "ROI %": roi - 1.0,
+    })
+
+
+def _macro_years(d1, cont, base_cost, org_margin, growth, donation_shock, cost_shock):
+    """Year 1-3 donations and costs as a 6-tuple; plain float math so Numba can compile it."""
+    cont = max(0.0, min(1.0, cont))
+    donation_mult = 1.0 + donation_shock
+    donations2 = d1 * cont
+    donations3 = donations2 * cont
+
+    cost1 = base_cost + (org_margin * base_cost)
+    cost2 = growth * cost1
+    cost3 = growth * (cost1 + cost2)
+    cost_mult = 1.0 + cost_shock
+
+    return (
+        d1 * donation_mult,
+        donations2 * donation_mult,
+        donations3 * donation_mult,
+        cost1 * cost_mult,
+        cost2 * cost_mult,
+        cost3 * cost_mult,
+    )
+
+
+# Compiled copy for use inside the sensitivity kernel; build_macro_forecast calls the Python one,
+# since a single scalar call doesn't pay back the JIT dispatch
+_macro_years_kernel = njit(cache=True)(_macro_years) if njit is not None else _macro_years
 
 
 def build_macro_forecast(inputs: MacroInputs) -> Dict[str, Any]:
@@ -35,55 +96,27 @@ def build_macro_forecast(inputs: MacroInputs) -> Dict[str, Any]:
     Negative cost growth is allowed to model cost reduction.
     """
 
-    # Donations
-    d1 = float(inputs.total_donations_y1)
     cont = max(0.0, min(1.0, float(inputs.donor_continuation_rate)))
-
-    donations1 = d1
-    donations2 = donations1 * cont
-    donations3 = donations2 * cont
-
-    donation_mult = 1.0 + float(inputs.donation_shock)
-    donations1 *= donation_mult
-    donations2 *= donation_mult
-    donations3 *= donation_mult
-
-    # Costs
-    base_cost = float(inputs.base_cost_y1)
-    org_margin = float(inputs.organizational_margin)
     growth = float(inputs.cost_growth)
 
-    cost1 = base_cost + (org_margin * base_cost)
-    cost2 = growth * cost1
-    cost3 = growth * (cost1 + cost2)
-
-    cost_mult = 1.0 + float(inputs.cost_shock)
-    cost1 *= cost_mult
-    cost2 *= cost_mult
-    cost3 *= cost_mult
-
-    # Forecast table
-    df = pd.DataFrame({
-        "Year": ["Year 1", "Year 2", "Year 3"],
-        "Donations": [donations1, donations2, donations3],
-        "Cost": [cost1, cost2, cost3],
-    })
-
-    df["Net"] = df["Donations"] - df["Cost"]
-    df["ROI Multiple"] = df.apply(
-        lambda r: _safe_div(r["Donations"], r["Cost"]) if r["Cost"] > 0 else 0.0,
-        axis=1
+    donations1, donations2, donations3, cost1, cost2, cost3 = _macro_years(
+        float(inputs.total_donations_y1),
+        cont,
+        float(inputs.base_cost_y1),
+        float(inputs.organizational_margin),
+        growth,
+        float(inputs.donation_shock),
+        float(inputs.cost_shock),
     )
-    df["ROI %"] = df["ROI Multiple"] - 1.0
 
-    # KPI summary
-    total_don = float(df["Donations"].sum())
-    total_cost = float(df["Cost"].sum())
-    total_net = float(df["Net"].sum())
+    # KPI summary (plain floats; the DataFrame is only built for the forecast table)
+    total_don = donations1 + donations2 + donations3
+    total_cost = cost1 + cost2 + cost3
+    total_net = total_don - total_cost
 
-    roi_multiple_3yr = _safe_div(total_don, total_cost) if total_cost > 0 else 0.0
+    roi_multiple_3yr = safe_div(total_don, total_cost) if total_cost > 0 else 0.0
     roi_pct_3yr = roi_multiple_3yr - 1.0
-    cost_per_1 = _safe_div(total_cost, total_don) if total_don > 0 else 0.0
+    cost_per_1 = safe_div(total_cost, total_don) if total_don > 0 else 0.0
 
     kpis = {
         "Total Donations (3yr)": total_don,
@@ -94,57 +127,117 @@ def build_macro_forecast(inputs: MacroInputs) -> Dict[str, Any]:
         "Cost per $1 (3yr)": cost_per_1,
     }
 
-    recommendations = []
+    recommendations = (
+        _REC_CONT_LOW if cont < 0.40 else _REC_CONT_MODERATE if cont < 0.60 else _REC_CONT_STRONG,
+        _REC_DONATION_MODEL,
+        _REC_COST_MODEL,
+        _REC_GROWTH_NEGATIVE if growth < 0 else _REC_GROWTH_FLAT if growth == 0 else _REC_GROWTH_POSITIVE,
+        _REC_ROI_BELOW_1 if roi_multiple_3yr < 1.0 else _REC_ROI_MODERATE if roi_multiple_3yr < 2.0 else _REC_ROI_STRONG,
+    )
 
-    if cont < 0.40:
-        recommendations.append(
-            "Donor continuation is relatively low. Improving retention of Year 1 donors would materially strengthen 3-year donations."
-        )
-    elif cont < 0.60:
-        recommendations.append(
-            "Donor continuation is moderate. Small improvements in retention could produce meaningful gains in long-term donations."
+    return {
+        "forecast_df": _make_forecast_df(
+            np.array([donations1, donations2, donations3], dtype=np.float64),
+            np.array([cost1, cost2, cost3], dtype=np.float64),
+        ),
+        "kpis": kpis,
+        "recommendations": recommendations,
+    }
+
+
+def _roi_grid_loop(continuation_vals, cost_growth_vals, d1, base_cost, org_margin, donation_shock, cost_shock):
+    """3-year ROI Multiple for every (continuation, cost growth) pair, same math as build_macro_forecast."""
+    n_cont = continuation_vals.shape[0]
+    n_growth = cost_growth_vals.shape[0]
+
+    # Donations depend only on continuation and costs only on growth, so each total is computed
+    # once per row / column rather than once per cell
+    total_don = np.empty(n_cont)
+    for i in range(n_cont):
+        don1, don2, don3, _, _, _ = _macro_years_kernel(
+            d1, continuation_vals[i], base_cost, org_margin, 0.0, donation_shock, cost_shock
         )
-    else:
-        recommendations.append(
-            "Donor continuation is strong. Focus on sustaining donor relationships and protecting renewal rates."
+        total_don[i] = don1 + don2 + don3
+
+    total_cost = np.empty(n_growth)
+    for j in range(n_growth):
+        _, _, _, cost1, cost2, cost3 = _macro_years_kernel(
+            d1, 0.0, base_cost, org_margin, cost_growth_vals[j], donation_shock, cost_shock
         )
+        total_cost[j] = cost1 + cost2 + cost3
+
+    z = np.empty((n_cont, n_growth))
+    for i in prange(n_cont):
+        for j in range(n_growth):
+            z[i, j] = total_don[i] / total_cost[j] if total_cost[j] > 0 else 0.0
+
+    return z
+
+
+def build_macro_forecast_grid(
+    total_donations_y1,
+    donor_continuation_rate,
+    base_cost_y1,
+    organizational_margin,
+    cost_growth,
+    donation_shock=0.0,
+    cost_shock=0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Broadcast version of the build_macro_forecast recurrence. Every argument may be a scalar or an
+    array (same names as MacroInputs); returns (donations, costs), each shaped (*broadcast shape, 3)
+    with Year 1-3 along the last axis.
+    """
+    cont = np.clip(np.asarray(donor_continuation_rate, dtype=np.float64), 0.0, 1.0)
+    growth = np.asarray(cost_growth, dtype=np.float64)
+
+    donations1 = np.asarray(total_donations_y1, dtype=np.float64) * (1.0 + np.asarray(donation_shock, dtype=np.float64))
+    donations2 = donations1 * cont
+    donations3 = donations2 * cont
 
-    recommendations.append(
-        "The donation model assumes Year 2 comes from retained Year 1 donors, while Year 3 comes from retained Year 2 donors."
+    base_cost = np.asarray(base_cost_y1, dtype=np.float64)
+    cost1 = (base_cost + np.asarray(organizational_margin, dtype=np.float64) * base_cost) * (
+        1.0 + np.asarray(cost_shock, dtype=np.float64)
     )
+    cost2 = growth * cost1
+    cost3 = growth * (cost1 + cost2)
+
+    # Broadcast both sides together so donations and costs share the full shape
+    years = np.broadcast_arrays(donations1, donations2, donations3, cost1, cost2, cost3)
+    donations = np.stack(years[:3], axis=-1)
+    costs = np.stack(years[3:], axis=-1)
+    return donations, costs
 
-    recommendations.append(
-        "The cost model assumes Year 1 includes the full base cost plus organizational margin, Year 2 is a growth percentage of Year 1 cost, and Year 3 is a growth percentage of the combined Year 1 and Year 2 cost."
+
+def _roi_grid_numpy(continuation_vals, cost_growth_vals, d1, base_cost, org_margin, donation_shock, cost_shock):
+    """Broadcast version of _roi_grid_loop: continuation runs down the rows, cost growth across the columns."""
+    donations, costs = build_macro_forecast_grid(
+        d1, continuation_vals[:, None], base_cost, org_margin, cost_growth_vals[None, :], donation_shock, cost_shock
     )
+    total_don = donations.sum(axis=-1)
+    total_cost = costs.sum(axis=-1)
+    positive = total_cost > 0
+    return np.divide(total_don, total_cost, out=np.zeros(total_cost.shape), where=positive)
 
-    if growth < 0:
-        recommendations.append(
-            "Cost growth is negative, meaning the model assumes cost reduction in Years 2 and 3."
-        )
-    elif growth == 0:
-        recommendations.append(
-            "Cost growth is flat, so no additional Year 2 or Year 3 growth cost is assumed."
-        )
-    else:
-        recommendations.append(
-            "Positive cost growth adds incremental cost in Years 2 and 3 based on prior accumulated cost."
-        )
 
-    if roi_multiple_3yr < 1.0:
-        recommendations.append(
-            "The model shows costs exceed donations over the 3-year horizon. Review organizational margin, cost growth, and donor continuation assumptions."
-        )
-    elif roi_multiple_3yr < 2.0:
-        recommendations.append(
-            "The model shows a positive but moderate return. Tighter cost discipline or stronger donor continuation would improve the result."
-        )
-    else:
-        recommendations.append(
-            "The model shows a strong return across the 3-year horizon. Maintaining donor continuation and cost discipline will be important."
-        )
+_roi_grid_kernel = njit(parallel=True, cache=True)(_roi_grid_loop) if njit is not None else _roi_grid_numpy
 
-    return {
-        "forecast_df": df,
-        "kpis": kpis,
-        "recommendations": recommendations,
-    }
+
+def build_roi_sensitivity_grid(
+    base_inputs: MacroInputs,
+    continuation_vals: Sequence[float],
+    cost_growth_vals: Sequence[float],
+) -> np.ndarray:
+    """
+    ROI Multiple (3yr) grid with rows = donor continuation rates and columns = cost growth values.
+    All other assumptions come from base_inputs.
+    """
+    return _roi_grid_kernel(
+        np.asarray(continuation_vals, dtype=np.float64),
+        np.asarray(cost_growth_vals, dtype=np.float64),
+        float(base_inputs.total_donations_y1),
+        float(base_inputs.base_cost_y1),
+        float(base_inputs.organizational_margin),
+        float(base_inputs.donation_shock),
+        float(base_inputs.cost_shock),
+    )
@@ -3,86 +3,84 @@ import io
 import pandas as pd
 import streamlit as st
 
-from .macro_model import MacroInputs, build_macro_forecast
-from .reports_pdf import build_macro_pdf
-from .charts import (
-    macro_3yr_trend_line,
-    macro_roi_bar,
-    macro_donations_allocation_chart,
-    macro_comparison_chart,
-    macro_roi_sensitivity_heatmap,
-)
+from .macro_model import MacroInputs, build_macro_forecast, build_roi_sensitivity_grid
 
 
 def macro_interpretation(model: dict, assumptions: dict) -> str:
-    k = model.get("kpis", {}) or {}
-
-    total_don = float(k.get("Total Donations (3yr)", 0.0))
-    total_cost = float(k.get("Total Cost (3yr)", 0.0))
-    total_net = float(k.get("Total Net (3yr)", 0.0))
-    roi_mult = float(k.get("ROI Multiple (3yr)", 0.0))
-    roi_pct = float(k.get("ROI % (3yr)", roi_mult - 1.0))
-    c_per_1 = float(k.get("Cost per $1 (3yr)", 0.0))
-
-    lines = []
-    lines.append(
-        "This Macro View is a strategic planning tool. It assumes that Year 2 donations are a percentage of Year 1 donations from retained donors, and Year 3 donations are a percentage of Year 2 donations from retained donors."
-    )
-    lines.append(
-        "For cost, Year 1 equals base cost plus organizational margin, Year 2 equals cost growth applied to Year 1 cost, and Year 3 equals cost growth applied to the combined Year 1 and Year 2 cost."
-    )
-    lines.append(
-        f"Over the 3-year horizon, the model projects **${total_don:,.0f}** in donations against **${total_cost:,.0f}** in modeled cost, resulting in a net of **${total_net:,.0f}**."
-    )
-    lines.append(
-        f"That corresponds to an overall **ROI of {roi_mult:.2f}x** (approximately **{roi_pct*100:,.1f}%**) and a **cost per $1 of ${c_per_1:.2f}**."
-    )
-    lines.append(
-        f"Assumptions used: **Donor Continuation Rate = {float(assumptions['Donor Continuation Rate']):.0%}**, "
-        f"**Organizational Margin (Year 1 only) = {float(assumptions['Organizational Margin (Y1 only)']):.0%}**, "
-        f"**Cost Growth Add-on = {float(assumptions['Cost Growth Add-on (Y2 & Y3)']):+.0%}**, "
-        f"**Donation Shock = {float(assumptions['Donation Shock']):+.0%}**, "
-        f"**Cost Shock = {float(assumptions['Cost Shock']):+.0%}**."
-    )
+    kget = (model.get("kpis", {}) or {}).get
+
+    total_don = float(kget("Total Donations (3yr)", 0.0))
+    total_cost = float(kget("Total Cost (3yr)", 0.0))
+    total_net = float(kget("Total Net (3yr)", 0.0))
+    roi_mult = float(kget("ROI Multiple (3yr)", 0.0))
+    roi_pct = float(kget("ROI % (3yr)", roi_mult - 1.0))
+    c_per_1 = float(kget("Cost per $1 (3yr)", 0.0))
 
     if roi_mult < 1.0:
-        lines.append(
-            "The model indicates that total cost exceeds the 3-year donation outcome. Increasing donor continuation or tightening cost assumptions would improve the result."
-        )
+        outlook = "The model indicates that total cost exceeds the 3-year donation outcome. Increasing donor continuation or tightening cost assumptions would improve the result."
     elif roi_mult < 2.0:
-        lines.append(
-            "The model indicates a positive but moderate return. Better donor continuation or stronger cost control would improve long-term value."
-        )
+        outlook = "The model indicates a positive but moderate return. Better donor continuation or stronger cost control would improve long-term value."
     else:
-        lines.append(
-            "The model indicates a strong return across the 3-year horizon."
-        )
+        outlook = "The model indicates a strong return across the 3-year horizon."
 
-    return "\n\n".join(lines)
+    return "\n\n".join((
+        "This Macro View is a strategic planning tool. It assumes that Year 2 donations are a percentage of Year 1 donations from retained donors, and Year 3 donations are a percentage of Year 2 donations from retained donors.",
+        "For cost, Year 1 equals base cost plus organizational margin, Year 2 equals cost growth applied to Year 1 cost, and Year 3 equals cost growth applied to the combined Year 1 and Year 2 cost.",
+        f"Over the 3-year horizon, the model projects **${total_don:,.0f}** in donations against **${total_cost:,.0f}** in modeled cost, resulting in a net of **${total_net:,.0f}**.",
+        f"That corresponds to an overall **ROI of {roi_mult:.2f}x** (approximately **{roi_pct*100:,.1f}%**) and a **cost per $1 of ${c_per_1:.2f}**.",
+        f"Assumptions used: **Donor Continuation Rate = {float(assumptions['Donor Continuation Rate']):.0%}**, "
+        f"**Organizational Margin (Year 1 only) = {float(assumptions['Organizational Margin (Y1 only)']):.0%}**, "
+        f"**Cost Growth Add-on = {float(assumptions['Cost Growth Add-on (Y2 & Y3)']):+.0%}**, "
+        f"**Donation Shock = {float(assumptions['Donation Shock']):+.0%}**, "
+        f"**Cost Shock = {float(assumptions['Cost Shock']):+.0%}**.",
+        outlook,
+    ))
 
 
 def _build_sensitivity_pivot(base_inputs: MacroInputs) -> pd.DataFrame:
     continuation_vals = [0.30, 0.40, 0.50, 0.60, 0.70, 0.80, 0.90]
     cg_vals = [-0.10, -0.05, 0.00, 0.05, 0.10, 0.15, 0.20]
 
-    rows = []
-    for cont in continuation_vals:
-        for cg in cg_vals:
-            test_inputs = MacroInputs(
-                total_donations_y1=base_inputs.total_donations_y1,
-                donor_continuation_rate=cont,
-                base_cost_y1=base_inputs.base_cost_y1,
-                organizational_margin=base_inputs.organizational_margin,
-                cost_growth=cg,
-                donation_shock=base_inputs.donation_shock,
-                cost_shock=base_inputs.cost_shock,
-            )
-            m = build_macro_forecast(test_inputs)
-            roi = float(m["kpis"].get("ROI Multiple (3yr)", 0.0))
-            rows.append({"Continuation": cont, "CostGrowth": cg, "ROI": roi})
-
-    df = pd.DataFrame(rows)
-    return df.pivot(index="Continuation", columns="CostGrowth", values="ROI").sort_index()
+    z = build_roi_sensitivity_grid(base_inputs, continuation_vals, cg_vals)
+    return pd.DataFrame(
+        z,
+        index=pd.Index(continuation_vals, name="Continuation"),
+        columns=pd.Index(cg_vals, name="CostGrowth"),
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_macro_forecast(inputs: MacroInputs) -> dict:
+    return build_macro_forecast(inputs)
+
+
+# The report builders below are keyed on MacroInputs alone: the assumptions, model, sensitivity
+# pivot and interpretation passed alongside are all derived from it, so they aren't hashed.
+@st.cache_data(show_spinner=False, max_entries=16)
+def _macro_excel_bytes(inputs: MacroInputs, _assumptions: dict, _model: dict, _pivot: pd.DataFrame, _interpretation: str) -> bytes:
+    excel_out = io.BytesIO()
+    with pd.ExcelWriter(excel_out, engine="xlsxwriter") as writer:
+        pd.DataFrame([_assumptions]).to_excel(writer, sheet_name="Assumptions", index=False)
+        pd.DataFrame([_model["kpis"]]).to_excel(writer, sheet_name="KPIs", index=False)
+        _model["forecast_df"].to_excel(writer, sheet_name="Forecast", index=False)
+        _pivot.reset_index().to_excel(writer, sheet_name="Sensitivity", index=False)
+        pd.DataFrame([{"Interpretation": _interpretation}]).to_excel(
+            writer, sheet_name="Interpretation", index=False
+        )
+    return excel_out.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _macro_pdf_bytes(inputs: MacroInputs, _assumptions: dict, _model: dict) -> bytes:
+    from .reports_pdf import build_macro_pdf
+
+    return build_macro_pdf(
+        title="BJC 3-Year Strategic Planning Forecast",
+        kpis=_model["kpis"],
+        assumptions=_assumptions,
+        recs=_model.get("recommendations", []),
+        forecast_df=_model["forecast_df"],
+    )
 
 
 def macro_view():
@@ -123,7 +121,7 @@ def macro_view():
         cost_shock=float(cost_shock),
     )
 
-    model = build_macro_forecast(inputs)
+    model = _cached_macro_forecast(inputs)
     k = model["kpis"]
 
     k1, k2, k3, k4, k5 = st.columns(5)
@@ -143,10 +141,22 @@ def macro_view():
         "Cost Shock": cost_shock,
     }
 
+    # Shown in the Interpretation tab and written to the Excel export
+    interpretation = macro_interpretation(model, assumptions)
+
     st.divider()
     t1, t2 = st.tabs(["Charts", "Interpretation"])
 
     with t1:
+        # Imported here so importing this module doesn't pull in plotly
+        from .charts import (
+            macro_3yr_trend_line,
+            macro_roi_bar,
+            macro_donations_allocation_chart,
+            macro_comparison_chart,
+            macro_roi_sensitivity_heatmap,
+        )
+
         st.subheader("Donations Allocation Across 3 Years")
         st.plotly_chart(macro_donations_allocation_chart(model["forecast_df"]), use_container_width=True)
 
@@ -173,7 +183,7 @@ def macro_view():
 
     with t2:
         st.subheader("Interpretation")
-        st.markdown(macro_interpretation(model, assumptions))
+        st.markdown(interpretation)
 
         st.subheader("Recommendations")
         for r in model.get("recommendations", []):
@@ -182,33 +192,16 @@ def macro_view():
     st.divider()
     st.subheader("Download Reports")
 
-    excel_out = io.BytesIO()
-    with pd.ExcelWriter(excel_out, engine="xlsxwriter") as writer:
-        pd.DataFrame([assumptions]).to_excel(writer, sheet_name="Assumptions", index=False)
-        pd.DataFrame([model["kpis"]]).to_excel(writer, sheet_name="KPIs", index=False)
-        model["forecast_df"].to_excel(writer, sheet_name="Forecast", index=False)
-        pivot.reset_index().to_excel(writer, sheet_name="Sensitivity", index=False)
-        pd.DataFrame([{"Interpretation": macro_interpretation(model, assumptions)}]).to_excel(
-            writer, sheet_name="Interpretation", index=False
-        )
-
     st.download_button(
         "Download Excel Report",
-        data=excel_out.getvalue(),
+        data=_macro_excel_bytes(inputs, assumptions, model, pivot, interpretation),
         file_name="bjc_macro_donations_forecast.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
-    pdf_bytes = build_macro_pdf(
-        title="BJC 3-Year Strategic Planning Forecast",
-        kpis=model["kpis"],
-        assumptions=assumptions,
-        recs=model.get("recommendations", []),
-        forecast_df=model["forecast_df"],
-    )
     st.download_button(
         "Download PDF Report",
-        data=pdf_bytes,
+        data=_macro_pdf_bytes(inputs, assumptions, model),
         file_name="bjc_macro_donations_summary.pdf",
         mime="application/pdf",
     )
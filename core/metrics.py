@@ -1,9 +1,39 @@
+from typing import NamedTuple
+
+import numpy as np
 import pandas as pd
-from core.utils import safe_div
+from pandas.api.types import union_categoricals
+from core.utils import safe_div, safe_div_vec
+
+
+class KPIs(NamedTuple):
+    total_raised: float
+    total_costs: float
+    net_raised: float
+    roi: float
+    cost_to_raise_1: float
+    donors: int
+    gifts: int
+    avg_gift: float
+
+
+def compute_monthly(donations: pd.DataFrame, costs: pd.DataFrame) -> tuple:
+    """Per-month raised and cost totals, shared by the KPI row and the trend chart."""
+    d_monthly = donations.groupby("month", sort=False, observed=True)["amount"].sum()
+    c_monthly = costs.groupby("month", sort=False, observed=True)["cost_amount"].sum()
+    return d_monthly, c_monthly
 
-def compute_kpis(donations: pd.DataFrame, costs: pd.DataFrame) -> dict:
-    total_raised = float(donations["amount"].fillna(0).sum())
-    total_costs = float(costs["cost_amount"].fillna(0).sum())
+def compute_kpis(donations: pd.DataFrame, costs: pd.DataFrame,
+                 d_monthly: pd.Series = None, c_monthly: pd.Series = None) -> KPIs:
+    # Totals come from the monthly aggregates when the caller already has them
+    if d_monthly is None:
+        total_raised = float(donations["amount"].sum())
+    else:
+        total_raised = float(d_monthly.sum())
+    if c_monthly is None:
+        total_costs = float(costs["cost_amount"].sum())
+    else:
+        total_costs = float(c_monthly.sum())
     net_raised = total_raised - total_costs
 
     roi = (net_raised / total_costs) if total_costs > 0 else 0.0
@@ -13,22 +43,62 @@ def compute_kpis(donations: pd.DataFrame, costs: pd.DataFrame) -> dict:
     gifts = int(len(donations))
     avg_gift = safe_div(total_raised, gifts) if gifts > 0 else 0.0
 
-    return {
-        "total_raised": total_raised,
-        "total_costs": total_costs,
-        "net_raised": net_raised,
-        "roi": roi,
-        "cost_to_raise_1": cost_to_raise_1,
-        "donors": donors,
-        "gifts": gifts,
-        "avg_gift": avg_gift,
-    }
+    return KPIs(
+        total_raised=total_raised,
+        total_costs=total_costs,
+        net_raised=net_raised,
+        roi=roi,
+        cost_to_raise_1=cost_to_raise_1,
+        donors=donors,
+        gifts=gifts,
+        avg_gift=avg_gift,
+    )
+
+def _categorical_rollup(donations: pd.DataFrame, costs: pd.DataFrame, by: str) -> pd.DataFrame:
+    """Raised/costs per key for categorical keys: one shared code space, then a bincount per side."""
+    keys = union_categoricals([donations[by].array, costs[by].array])
+    n_keys = len(keys.categories)
+    n_don = len(donations)
+    d_codes = keys.codes[:n_don]
+    c_codes = keys.codes[n_don:]
+
+    def _sums(codes: np.ndarray, values: pd.Series) -> tuple:
+        valid = codes >= 0  # NaN keys are dropped, as groupby does
+        v = values.to_numpy(dtype="float64")[valid]
+        totals = np.bincount(codes[valid], weights=np.where(np.isnan(v), 0.0, v), minlength=n_keys)
+        seen = np.bincount(codes[valid], minlength=n_keys) > 0
+        return totals, seen
+
+    raised, d_seen = _sums(d_codes, donations["amount"])
+    cost, c_seen = _sums(c_codes, costs["cost_amount"])
+    observed = d_seen | c_seen
+    return pd.DataFrame(
+        {"raised": raised[observed], "costs": cost[observed]},
+        index=pd.Index(keys.categories[observed], name=by),
+    )
+
 
 def compute_rollups(donations: pd.DataFrame, costs: pd.DataFrame, by: str) -> pd.DataFrame:
-    raised = donations.groupby(by)["amount"].sum().rename("raised")
-    cost = costs.groupby(by)["cost_amount"].sum().rename("costs")
-    out = pd.concat([raised, cost], axis=1).fillna(0)
-    out["net"] = out["raised"] - out["costs"]
-    out["roi"] = out.apply(lambda r: (r["net"] / r["costs"]) if r["costs"] > 0 else 0.0, axis=1)
-    out["cost_to_raise_1"] = out.apply(lambda r: (r["costs"] / r["raised"]) if r["raised"] > 0 else 0.0, axis=1)
+    d_dtype = donations[by].dtype
+    c_dtype = costs[by].dtype
+    # union_categoricals needs both sides' categories in the same dtype; an all-NaN column has object
+    # categories while a populated one has str categories under pandas 3, so mixed cases use groupby
+    if (
+        isinstance(d_dtype, pd.CategoricalDtype)
+        and isinstance(c_dtype, pd.CategoricalDtype)
+        and d_dtype.categories.dtype == c_dtype.categories.dtype
+    ):
+        out = _categorical_rollup(donations, costs, by)
+    else:
+        raised = donations.groupby(by, sort=False, observed=True)["amount"].sum()
+        cost = costs.groupby(by, sort=False, observed=True)["cost_amount"].sum()
+        # concat aligns without sorting the union index, which would raise on mixed int/str keys
+        out = pd.concat([raised.rename("raised"), cost.rename("costs")], axis=1).fillna(0.0)
+
+    raised_v = out["raised"].to_numpy()
+    costs_v = out["costs"].to_numpy()
+    net_v = raised_v - costs_v
+    out["net"] = net_v
+    out["roi"] = safe_div_vec(net_v, costs_v, where=costs_v > 0)
+    out["cost_to_raise_1"] = safe_div_vec(costs_v, raised_v, where=raised_v > 0)
     return out.reset_index()
@@ -1,28 +1,55 @@
 import io
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook
 from core.metrics import compute_rollups
+from core.utils import join_filters
 
-def build_excel_report(d: pd.DataFrame, c: pd.DataFrame, payload: dict) -> bytes:
-    out = io.BytesIO()
+def _column_values(s: pd.Series) -> list:
+    """One column as plain Python values, converted once per column rather than per cell."""
+    if isinstance(s.dtype, np.dtype) and s.dtype.kind in "biuf":
+        # NumPy numerics: tolist() hands back Python ints/floats/bools in one C pass
+        values = s.to_numpy().tolist()
+    else:
+        values = s.astype(object).tolist()
+    # Missing values (NaN/NaT/pd.NA) become empty cells, as with to_excel
+    for i in np.flatnonzero(s.isna().to_numpy()):
+        values[i] = None
+    return values
+
+def _append_sheet(wb: Workbook, title: str, df: pd.DataFrame) -> None:
+    ws = wb.create_sheet(title=title)
+    append = ws.append  # bound once; the row loop below is the hot path for the filtered dumps
+    append([str(col) for col in df.columns])
+    columns = [_column_values(df.iloc[:, j]) for j in range(df.shape[1])]
+    for row in zip(*columns):
+        append(row)
 
-    roll_campaign = compute_rollups(d, c, by="campaign_code").sort_values("raised", ascending=False)
-    roll_channel = compute_rollups(d, c, by="channel").sort_values("raised", ascending=False)
+def _append_record(wb: Workbook, title: str, record: dict) -> None:
+    """Single-row sheet: header row from the keys, then the values."""
+    ws = wb.create_sheet(title=title)
+    ws.append(list(record))
+    ws.append(list(record.values()))
+
+def build_excel_report(d: pd.DataFrame, c: pd.DataFrame, payload: dict, *,
+                       roll_campaign: pd.DataFrame = None, roll_channel: pd.DataFrame = None) -> bytes:
+    """Rollups already computed by the caller (sorted by raised, descending) are reused as-is."""
+    out = io.BytesIO()
 
-    kpis = pd.DataFrame([payload["kpis"]])
-    filters = pd.DataFrame([{
-        "start": payload["filters"]["start"],
-        "end": payload["filters"]["end"],
-        "channels": ", ".join(payload["filters"]["channels"]),
-        "campaigns": ", ".join(payload["filters"]["campaigns"]),
-        "segments": ", ".join(payload["filters"]["segments"]),
-    }])
+    if roll_campaign is None:
+        roll_campaign = compute_rollups(d, c, by="campaign_code").sort_values("raised", ascending=False)
+    if roll_channel is None:
+        roll_channel = compute_rollups(d, c, by="channel").sort_values("raised", ascending=False)
 
-    with pd.ExcelWriter(out, engine="openpyxl") as writer:
-        filters.to_excel(writer, sheet_name="Filters", index=False)
-        kpis.to_excel(writer, sheet_name="KPIs", index=False)
-        roll_campaign.to_excel(writer, sheet_name="By Campaign", index=False)
-        roll_channel.to_excel(writer, sheet_name="By Channel", index=False)
-        d.to_excel(writer, sheet_name="Donations (Filtered)", index=False)
-        c.to_excel(writer, sheet_name="Costs (Filtered)", index=False)
+    # write_only streams rows straight to the zip instead of building a cell object per value
+    wb = Workbook(write_only=True)
+    # One-row sheets are written straight from the dicts, without a DataFrame round trip
+    _append_record(wb, "Filters", payload.get("filters_joined") or join_filters(payload["filters"]))
+    _append_record(wb, "KPIs", payload["kpis"])
+    _append_sheet(wb, "By Campaign", roll_campaign)
+    _append_sheet(wb, "By Channel", roll_channel)
+    _append_sheet(wb, "Donations (Filtered)", d)
+    _append_sheet(wb, "Costs (Filtered)", c)
+    wb.save(out)
 
     return out.getvalue()
@@ -4,6 +4,15 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 
+# Built once per process: the sample stylesheet and the shared table style never change between reports
+_STYLES = getSampleStyleSheet()
+_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("PADDING", (0, 0), (-1, -1), 6),
+])
+
 
 def _money(x) -> str:
     try:
@@ -29,7 +38,7 @@ def build_macro_pdf(title: str, kpis: dict, assumptions: dict, recs: list, forec
         topMargin=40,
         bottomMargin=40
     )
-    styles = getSampleStyleSheet()
+    styles = _STYLES
 
     story = []
 
@@ -57,12 +66,7 @@ def build_macro_pdf(title: str, kpis: dict, assumptions: dict, recs: list, forec
         ["Cost per $1 (3yr)", f"${float(kpis.get('Cost per $1 (3yr)', 0)):.2f}"],
     ]
     kpi_table = Table(kpi_rows, hAlign="LEFT")
-    kpi_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
+    kpi_table.setStyle(_TABLE_STYLE)
     story.append(kpi_table)
     story.append(Spacer(1, 12))
 
@@ -79,40 +83,38 @@ def build_macro_pdf(title: str, kpis: dict, assumptions: dict, recs: list, forec
         assumption_rows.append([str(k), val])
 
     assumption_table = Table(assumption_rows, hAlign="LEFT")
-    assumption_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
+    assumption_table.setStyle(_TABLE_STYLE)
     story.append(assumption_table)
     story.append(Spacer(1, 12))
 
     story.append(Paragraph("3-Year Forecast", styles["Heading2"]))
     forecast_rows = [["Year", "Donations", "Cost", "Net", "ROI Multiple"]]
-    for _, row in forecast_df.iterrows():
+    n_rows = len(forecast_df)
+
+    def _column(name: str, default) -> list:
+        return forecast_df[name].tolist() if name in forecast_df.columns else [default] * n_rows
+
+    for year, donations, cost, net, roi in zip(
+        _column("Year", ""), _column("Donations", 0), _column("Cost", 0), _column("Net", 0), _column("ROI Multiple", 0)
+    ):
         forecast_rows.append([
-            str(row.get("Year", "")),
-            _money(row.get("Donations", 0)),
-            _money(row.get("Cost", 0)),
-            _money(row.get("Net", 0)),
-            f"{float(row.get('ROI Multiple', 0)):.2f}x",
+            str(year),
+            _money(donations),
+            _money(cost),
+            _money(net),
+            f"{float(roi):.2f}x",
         ])
 
     forecast_table = Table(forecast_rows, hAlign="LEFT")
-    forecast_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
+    forecast_table.setStyle(_TABLE_STYLE)
     story.append(forecast_table)
     story.append(Spacer(1, 12))
 
     story.append(Paragraph("Recommendations", styles["Heading2"]))
-    for r in recs:
-        story.append(Paragraph(f"• {r}", styles["BodyText"]))
-        story.append(Spacer(1, 6))
+    # Bullet text built in one pass; the body style is looked up once
+    body = styles["BodyText"]
+    for line in ["• " + str(r) for r in recs]:
+        story.extend((Paragraph(line, body), Spacer(1, 6)))
 
     doc.build(story)
     pdf = buffer.getvalue()
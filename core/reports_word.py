@@ -2,15 +2,19 @@ import io
 import pandas as pd
 from docx import Document
 from core.metrics import compute_rollups
+from core.utils import join_filters
 
-def build_word_report(d: pd.DataFrame, c: pd.DataFrame, payload: dict, notes: str = "") -> bytes:
+def build_word_report(d: pd.DataFrame, c: pd.DataFrame, payload: dict, notes: str = "", *,
+                      roll_campaign: pd.DataFrame = None) -> bytes:
+    """A campaign rollup already computed by the caller (sorted by raised, descending) is reused as-is."""
     doc = Document()
     doc.add_heading(payload["title"], level=1)
     doc.add_paragraph(f"Generated: {payload['generated_at']}")
-    doc.add_paragraph(f"Date range: {payload['filters']['start']} to {payload['filters']['end']}")
-    doc.add_paragraph(f"Channels: {', '.join(payload['filters']['channels'])}")
-    doc.add_paragraph(f"Campaigns: {', '.join(payload['filters']['campaigns'])}")
-    doc.add_paragraph(f"Donor segments: {', '.join(payload['filters']['segments'])}")
+    filters = payload.get("filters_joined") or join_filters(payload["filters"])
+    doc.add_paragraph(f"Date range: {filters['start']} to {filters['end']}")
+    doc.add_paragraph(f"Channels: {filters['channels']}")
+    doc.add_paragraph(f"Campaigns: {filters['campaigns']}")
+    doc.add_paragraph(f"Donor segments: {filters['segments']}")
 
     doc.add_heading("Executive KPIs", level=2)
     k = payload["kpis"]
@@ -26,10 +30,16 @@ def build_word_report(d: pd.DataFrame, c: pd.DataFrame, payload: dict, notes: st
         doc.add_paragraph(notes)
 
     doc.add_heading("Top Campaigns (by Raised)", level=2)
-    top = compute_rollups(d, c, by="campaign_code").sort_values("raised", ascending=False).head(15)
+    if roll_campaign is None:
+        # Only the top 15 are shown, so select them without sorting the whole rollup
+        top = compute_rollups(d, c, by="campaign_code").nlargest(15, "raised")
+    else:
+        top = roll_campaign.head(15)
 
-    table = doc.add_table(rows=1, cols=6)
-    hdr = table.rows[0].cells
+    # Sized once up front; add_row() per record re-walks the table XML each time
+    table = doc.add_table(rows=1 + len(top), cols=6)
+    rows = table.rows
+    hdr = rows[0].cells
     hdr[0].text = "Campaign"
     hdr[1].text = "Raised"
     hdr[2].text = "Costs"
@@ -37,14 +47,18 @@ def build_word_report(d: pd.DataFrame, c: pd.DataFrame, payload: dict, notes: st
     hdr[4].text = "ROI"
     hdr[5].text = "Cost/$"
 
-    for _, r in top.iterrows():
-        row = table.add_row().cells
-        row[0].text = str(r["campaign_code"])
-        row[1].text = f"${r['raised']:,.0f}"
-        row[2].text = f"${r['costs']:,.0f}"
-        row[3].text = f"${r['net']:,.0f}"
-        row[4].text = f"{r['roi']*100:,.1f}%"
-        row[5].text = f"${r['cost_to_raise_1']:,.2f}"
+    # Each column is formatted in one pass up front; the row loop only assigns finished strings
+    cols = [
+        [str(v) for v in top["campaign_code"].to_numpy()],
+        top["raised"].map("${:,.0f}".format).tolist(),
+        top["costs"].map("${:,.0f}".format).tolist(),
+        top["net"].map("${:,.0f}".format).tolist(),
+        (top["roi"] * 100).map("{:,.1f}%".format).tolist(),
+        top["cost_to_raise_1"].map("${:,.2f}".format).tolist(),
+    ]
+    for i, texts in enumerate(zip(*cols), start=1):
+        for cell, text in zip(rows[i].cells, texts):
+            cell.text = text
 
     out = io.BytesIO()
     doc.save(out)
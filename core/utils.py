@@ -1,6 +1,71 @@
 import pandas as pd
 import numpy as np
 
+def _alias_table(aliases: dict) -> dict:
+    """Freeze alias lists into tuples of normalized (lower/trim) names, once at import."""
+    return {target: tuple(str(a).strip().lower() for a in names) for target, names in aliases.items()}
+
+
+_DONATION_ALIASES = _alias_table({
+    # Required/canonical
+    "date": [
+        "date", "giftdate", "contributiondate", "transactiondate", "receiveddate",
+        "date received", "date rece"
+    ],
+    "amount": [
+        "amount", "contributionamount", "giftamount", "total"
+    ],
+    "donor_id": [
+        "donor_id", "vanid", "personid", "donorid", "contactid", "id"
+    ],
+    "campaign_code": [
+        "campaign_code", "appealcode", "campaign", "sourcecode", "fundraisingcode",
+        "appeal", "source code", "source co"
+    ],
+    # Practical default: treat Payment Method as channel if that's what you have
+    "channel": [
+        "channel", "source", "medium", "fundraisingsource",
+        "payment method", "payment m"
+    ],
+
+    # Optional extras (kept if present)
+    "contribution_id": ["contribution id", "contributi", "contributionid"],
+    "contact_name": ["contact name", "contact n", "contactname"],
+    "designation": ["designation", "designati"],
+    "payment_method": ["payment method", "payment m", "paymentmethod"],
+    "remaining_amount": ["remaining amount", "remaining", "remainingamount"],
+    "financial_batch": ["financial batch", "financialbatch"],
+})
+
+_COST_ALIASES = _alias_table({
+    "date": ["date", "expensedate", "paiddate", "transactiondate"],
+    "cost_amount": ["cost_amount", "amount", "expense", "cost", "total"],
+    "campaign_code": ["campaign_code", "appealcode", "campaign", "sourcecode", "fundraisingcode", "appeal"],
+    "channel": ["channel", "source", "medium"],
+    "cost_type": ["cost_type", "type", "category"],
+    "notes": ["notes", "memo", "description"],
+})
+
+
+def _alias_index(aliases: dict) -> dict:
+    """Flat alias -> ((target, priority), ...) map; an alias may feed more than one target."""
+    index = {}
+    for target, names in aliases.items():
+        for rank, name in enumerate(names):
+            index.setdefault(name, []).append((target, rank))
+    return {name: tuple(hits) for name, hits in index.items()}
+
+
+_DONATION_ALIAS_INDEX = _alias_index(_DONATION_ALIASES)
+_COST_ALIAS_INDEX = _alias_index(_COST_ALIASES)
+
+
+def source_columns(kind: str) -> frozenset:
+    """Normalized (lower/trim) source column names that normalize_columns can map for this kind."""
+    aliases = _DONATION_ALIASES if kind == "donations" else _COST_ALIASES
+    return frozenset(a for names in aliases.values() for a in names)
+
+
 def normalize_columns(df: pd.DataFrame, kind: str) -> pd.DataFrame:
     """
     Normalize raw uploads into the canonical schema the app expects.
@@ -13,68 +78,23 @@ def normalize_columns(df: pd.DataFrame, kind: str) -> pd.DataFrame:
     Costs canonical fields:
       - date, cost_amount, campaign_code, channel, cost_type, notes
     """
-    df = df.copy()
-
-    # Keep original columns but build a normalized lookup (lower/trim)
-    original_cols = list(df.columns)
-    norm_cols = [str(c).strip().lower() for c in original_cols]
-    df.columns = norm_cols  # work in normalized space
-
-    if kind == "donations":
-        aliases = {
-            # Required/canonical
-            "date": [
-                "date", "giftdate", "contributiondate", "transactiondate", "receiveddate",
-                "date received", "date rece"
-            ],
-            "amount": [
-                "amount", "contributionamount", "giftamount", "total"
-            ],
-            "donor_id": [
-                "donor_id", "vanid", "personid", "donorid", "contactid", "id"
-            ],
-            "campaign_code": [
-                "campaign_code", "appealcode", "campaign", "sourcecode", "fundraisingcode",
-                "appeal", "source code", "source co"
-            ],
-            # Practical default: treat Payment Method as channel if that's what you have
-            "channel": [
-                "channel", "source", "medium", "fundraisingsource",
-                "payment method", "payment m"
-            ],
-
-            # Optional extras (kept if present)
-            "contribution_id": ["contribution id", "contributi", "contributionid"],
-            "contact_name": ["contact name", "contact n", "contactname"],
-            "designation": ["designation", "designati"],
-            "payment_method": ["payment method", "payment m", "paymentmethod"],
-            "remaining_amount": ["remaining amount", "remaining", "remainingamount"],
-            "financial_batch": ["financial batch", "financialbatch"],
-        }
-    else:
-        aliases = {
-            "date": ["date", "expensedate", "paiddate", "transactiondate"],
-            "cost_amount": ["cost_amount", "amount", "expense", "cost", "total"],
-            "campaign_code": ["campaign_code", "appealcode", "campaign", "sourcecode", "fundraisingcode", "appeal"],
-            "channel": ["channel", "source", "medium"],
-            "cost_type": ["cost_type", "type", "category"],
-            "notes": ["notes", "memo", "description"],
-        }
-
-    def find_col(target: str):
-        """Return the first matching source column name (already normalized), or None."""
-        for c in aliases.get(target, []):
-            c_norm = str(c).strip().lower()
-            if c_norm in df.columns:
-                return c_norm
-        return None
-
-    out = pd.DataFrame()
-
-    # Build required outputs first
-    for target in aliases:
-        col = find_col(target)
-        out[target] = df[col] if col else np.nan
+    aliases = _DONATION_ALIASES if kind == "donations" else _COST_ALIASES
+    alias_index = _DONATION_ALIAS_INDEX if kind == "donations" else _COST_ALIAS_INDEX
+
+    # One pass over the upload's columns (normalized lower/trim). Each target keeps the column whose
+    # alias comes earliest in its alias list; among columns with the same normalized name the first wins.
+    # Only the mapped columns are read, so the upload itself is never copied.
+    best = {}
+    for c in df.columns:
+        for target, rank in alias_index.get(str(c).strip().lower(), ()):
+            if target not in best or rank < best[target][0]:
+                best[target] = (rank, c)
+
+    # Build required outputs first, in one construction rather than a column insert per target
+    out = pd.DataFrame(
+        {target: df[best[target][1]] if target in best else np.nan for target in aliases},
+        index=df.index,
+    )
 
     # Defaults
     if kind == "donations":
@@ -83,7 +103,9 @@ def normalize_columns(df: pd.DataFrame, kind: str) -> pd.DataFrame:
 
         # If payment_method exists but channel is UNMAPPED, populate channel from payment_method
         if "payment_method" in out.columns:
-            mask = out["channel"].isna() | (out["channel"].astype(str).str.strip() == "") | (out["channel"] == "UNMAPPED")
+            # channel was just filled, so it has no NaN left; blank means empty or whitespace-only
+            ch = out["channel"]
+            mask = (ch == "UNMAPPED") | (ch.astype(str).str.strip() == "")
             out.loc[mask, "channel"] = out.loc[mask, "payment_method"]
 
         # Keep the optional columns if present; otherwise leave them as-is (NaN)
@@ -98,9 +120,28 @@ def normalize_columns(df: pd.DataFrame, kind: str) -> pd.DataFrame:
     return out
 
 
+def join_filters(filters: dict) -> dict:
+    """Report-ready filter values: the selection lists joined into ", "-separated strings once."""
+    return {
+        "start": filters["start"],
+        "end": filters["end"],
+        "channels": ", ".join(filters["channels"]),
+        "campaigns": ", ".join(filters["campaigns"]),
+        "segments": ", ".join(filters["segments"]),
+    }
+
+
 def ensure_datetime(df: pd.DataFrame, col: str) -> pd.DataFrame:
-    df = df.copy()
-    df[col] = pd.to_datetime(df[col], errors="coerce")
+    # Shallow copy: only the coerced date column is new, the rest share the caller's arrays
+    df = df.copy(deep=False)
+    values = df[col]
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        # Uploads repeat the same few date strings heavily: parse each distinct value once (the format
+        # is still inferred from the first non-null value) and broadcast back through the codes
+        codes, uniques = pd.factorize(values)
+        parsed = pd.DatetimeIndex(pd.to_datetime(uniques, errors="coerce"))
+        values = pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=df.index, name=col)
+    df[col] = values
     df = df.dropna(subset=[col])
     return df
 
@@ -109,6 +150,9 @@ def month_floor(dt) -> str:
     return pd.to_datetime(dt).strftime("%Y-%m")
 
 
+DONOR_SEGMENTS = ("New", "Returning")
+
+
 def segment_donors_basic(d: pd.DataFrame) -> pd.DataFrame:
     """
     Default segmentation:
@@ -116,12 +160,38 @@ def segment_donors_basic(d: pd.DataFrame) -> pd.DataFrame:
     - Returning = otherwise
     (You can replace with a true 'prior-year retention' model later.)
     """
-    d = d.copy()
-    d = d.sort_values(["donor_id", "date"])
-    first = d.groupby("donor_id")["date"].transform("min")
-    d["donor_segment"] = (d["date"] == first).map({True: "New", False: "Returning"})
+    d = d.copy(deep=False)  # only donor_segment is added, so the other columns can be shared
+    # First gift date per donor via factorize + an unbuffered scatter-min over the integer codes,
+    # rather than a groupby transform broadcast back to the rows. Every gift on the donor's first
+    # date is New; gifts with a missing donor_id or date are Returning.
+    codes, uniques = pd.factorize(d["donor_id"])
+    # Ticks stay in the column's own unit; forcing [ns] would overflow dates outside 1677-2262
+    dates = d["date"].to_numpy()
+    valid = (codes >= 0) & ~np.isnat(dates)
+    ticks = dates.view("i8")
+
+    first = np.full(len(uniques), np.iinfo(np.int64).max)
+    np.minimum.at(first, codes[valid], ticks[valid])
+    is_new = np.zeros(len(codes), dtype=bool)
+    is_new[valid] = ticks[valid] == first[codes[valid]]
+
+    # Codes index DONOR_SEGMENTS directly (0 = New, 1 = Returning), so no label strings are built
+    d["donor_segment"] = pd.Categorical.from_codes((~is_new).astype(np.int8), categories=DONOR_SEGMENTS)
     return d
 
 
 def safe_div(a: float, b: float) -> float:
-    return float(a) / float(b) if b not in (0, None) else 0.0
\ No newline at end of file
+    return float(a) / float(b) if b not in (0, None) else 0.0
+
+
+def safe_div_vec(a, b, where=None) -> np.ndarray:
+    """
+    Array form of safe_div: a / b elementwise, 0.0 wherever b == 0 (or wherever the optional
+    `where` mask is False, for callers that only divide by positive denominators).
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if where is None:
+        where = b != 0
+    a, b, where = np.broadcast_arrays(a, b, where)
+    return np.divide(a, b, out=np.zeros(a.shape), where=where)
\ No newline at end of file